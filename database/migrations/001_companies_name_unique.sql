@@ -0,0 +1,5 @@
+-- Unique company names back the single round-trip upsert in
+-- BaseAgent._find_or_create_company (ON CONFLICT (name) DO NOTHING), and the
+-- btree index makes its select-by-name fallback an index scan.
+-- Remove any duplicate names before running this in the Supabase SQL editor.
+CREATE UNIQUE INDEX IF NOT EXISTS companies_name_key ON companies (name);
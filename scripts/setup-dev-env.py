@@ -8,36 +8,71 @@ import os
 import sys
 import subprocess
 import json
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
+
+# Successful prerequisite checks are cached here for a day, keyed by PATH
+_STAMP = Path('.dev-env-stamp.json')
+_STAMP_TTL_SECONDS = 24 * 60 * 60
 
 def run_command(cmd: List[str], cwd: Optional[Path] = None) -> bool:
     """Run a command and return success status."""
     try:
         print(f"Running: {' '.join(cmd)}")
-        result = subprocess.run(cmd, cwd=cwd, check=True, capture_output=True, text=True)
-        if result.stdout:
-            print(result.stdout)
+        # Output streams straight to the terminal instead of being buffered
+        subprocess.run(cmd, cwd=cwd, check=True)
         return True
     except subprocess.CalledProcessError as e:
         print(f"Error running command: {e}")
-        if e.stderr:
-            print(f"Error output: {e.stderr}")
         return False
 
+def _prerequisites_key() -> str:
+    """Identify the toolchain: a different PATH or interpreter invalidates the stamp."""
+    fingerprint = f"{os.environ.get('PATH', '')}|{sys.executable}|{sys.version}"
+    return hashlib.sha1(fingerprint.encode()).hexdigest()
+
+def _load_stamp(key: str) -> Optional[Dict[str, bool]]:
+    """Return cached prerequisite results if the stamp is fresh and matches."""
+    try:
+        stamp = json.loads(_STAMP.read_text())
+    except (OSError, ValueError):
+        return None
+    if stamp.get('path_key') != key or time.time() - stamp.get('ts', 0) > _STAMP_TTL_SECONDS:
+        return None
+    return stamp.get('checks')
+
 def check_prerequisites() -> Dict[str, bool]:
     """Check if required tools are installed."""
-    checks = {
-        'python': check_python(),
-        'node': check_node(),
-        'git': check_git(),
+    key = _prerequisites_key()
+    cached = _load_stamp(key)
+    if cached is not None:
+        print("✅ Prerequisites unchanged since last check (cached)")
+        return cached
+    
+    probes: Dict[str, Callable[[], bool]] = {
+        'python': check_python,
+        'node': check_node,
+        'git': check_git,
     }
+    # Each probe is an independent subprocess, so run them in parallel
+    with ThreadPoolExecutor(max_workers=len(probes)) as executor:
+        checks = dict(zip(probes, executor.map(lambda probe: probe(), probes.values())))
+    
+    # Only remember success, so a missing tool is re-checked on the next run
+    if all(checks.values()):
+        try:
+            _STAMP.write_text(json.dumps({'path_key': key, 'ts': time.time(), 'checks': checks}))
+        except OSError:
+            pass
     return checks
 
 def check_python() -> bool:
     """Check Python version."""
     try:
-        import sys
         version = sys.version_info
         if version.major == 3 and version.minor >= 11:
             print(f"✅ Python {version.major}.{version.minor}.{version.micro} found")
@@ -93,25 +128,19 @@ def setup_python_env() -> bool:
     # Determine Python executable in venv
     if os.name == 'nt':  # Windows
         python_exe = Path('venv/Scripts/python.exe')
-        pip_exe = Path('venv/Scripts/pip.exe')
         activate_script = Path('venv/Scripts/activate.bat')
     else:  # Unix-like
         python_exe = Path('venv/bin/python')
-        pip_exe = Path('venv/bin/pip')
         activate_script = Path('venv/bin/activate')
     
-    # Upgrade pip
-    if not run_command([str(pip_exe), 'install', '--upgrade', 'pip']):
-        return False
-    
-    # Install requirements
+    # Upgrade pip and install requirements plus dev dependencies in one resolver run.
+    # pip is invoked through the venv interpreter so it can upgrade itself on Windows.
+    install_cmd = [str(python_exe), '-m', 'pip', 'install', '--upgrade', 'pip']
     if Path('requirements.txt').exists():
-        if not run_command([str(pip_exe), 'install', '-r', 'requirements.txt']):
-            return False
-    
-    # Install development dependencies
-    if not run_command([str(pip_exe), 'install', '-e', '.[dev]']):
-        print("⚠️  Development dependencies installation failed (this is expected if pyproject.toml is not fully configured)")
+        install_cmd += ['-r', 'requirements.txt']
+    install_cmd += ['-e', '.[dev]']
+    if not run_command(install_cmd):
+        return False
     
     print("✅ Python environment setup complete")
     return True
@@ -145,18 +174,25 @@ def setup_git_hooks() -> bool:
     pre_commit_hook = hooks_dir / 'pre-commit'
     hook_content = '''#!/bin/sh
 # Pre-commit hook for code quality
+# Only runs the tools whose language has staged changes, on the staged files only.
 set -e
 
 echo "Running pre-commit checks..."
 
+staged_files=$(git diff --cached --name-only --diff-filter=ACM)
+py_files=$(echo "$staged_files" | grep '\\.py$' || true)
+frontend_files=$(echo "$staged_files" | grep '^frontend/' || true)
+
 # Python formatting and linting
-echo "Checking Python code..."
-black --check .
-ruff check .
-mypy .
+if [ -n "$py_files" ]; then
+    echo "Checking Python code..."
+    black --check $py_files
+    ruff check $py_files
+    mypy $py_files
+fi
 
-# Frontend checks (if frontend exists)
-if [ -d "frontend" ]; then
+# Frontend checks (if frontend files are staged)
+if [ -n "$frontend_files" ] && [ -d "frontend" ]; then
     echo "Checking frontend code..."
     cd frontend
     npm run lint
@@ -168,8 +204,10 @@ echo "✅ Pre-commit checks passed!"
 '''
     
     try:
-        with open(pre_commit_hook, 'w') as f:
-            f.write(hook_content)
+        if pre_commit_hook.exists() and pre_commit_hook.read_text() == hook_content:
+            print("✅ Git pre-commit hook up to date")
+            return True
+        pre_commit_hook.write_text(hook_content)
         pre_commit_hook.chmod(0o755)  # Make executable
         print("✅ Git pre-commit hook installed")
         return True
@@ -198,8 +236,13 @@ def setup_vscode_settings() -> bool:
     }
     
     try:
-        with open(vscode_dir / 'extensions.json', 'w') as f:
-            json.dump(extensions, f, indent=2)
+        # Skip the write when nothing changed so the file's mtime stays stable
+        extensions_file = vscode_dir / 'extensions.json'
+        new_bytes = json.dumps(extensions, indent=2).encode()
+        if extensions_file.exists() and extensions_file.read_bytes() == new_bytes:
+            print("✅ VS Code extensions up to date")
+            return True
+        extensions_file.write_bytes(new_bytes)
         print("✅ VS Code extensions recommendations created")
         return True
     except Exception as e:
@@ -229,24 +272,32 @@ def setup_environment_file() -> bool:
         print("⚠️  No .env.example found - create environment configuration manually")
         return True
 
+@contextmanager
+def temporary_sys_path(path: Path) -> Iterator[None]:
+    """Make path importable for the duration of the block only."""
+    sys.path.append(str(path))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(path))
+
 def verify_setup() -> bool:
     """Verify the development setup is working."""
     print("\n🧪 Verifying development setup...")
     
-    # Test Python imports
-    try:
-        import sys
-        sys.path.append(str(Path.cwd()))
-        from config.settings import settings
-        print("✅ Configuration system working")
-    except ImportError as e:
-        print(f"⚠️  Configuration system not ready: {e}")
-    
-    try:
-        from utils.database import db
-        print("✅ Database utilities loadable")
-    except ImportError as e:
-        print(f"⚠️  Database utilities not ready: {e}")
+    # Test Python imports from the source tree (this script runs outside the venv)
+    with temporary_sys_path(Path.cwd() / 'src'):
+        try:
+            from prospect_research.config.settings import settings
+            print("✅ Configuration system working")
+        except ImportError as e:
+            print(f"⚠️  Configuration system not ready: {e}")
+        
+        try:
+            from prospect_research.utils.database import db
+            print("✅ Database utilities loadable")
+        except ImportError as e:
+            print(f"⚠️  Database utilities not ready: {e}")
     
     return True
 
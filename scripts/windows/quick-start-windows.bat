@@ -91,7 +91,7 @@ echo Opening in 3 seconds...
 timeout /t 3 /nobreak > nul
 
 REM Start the API server
-start "Backend API Server" cmd /k "title Backend API - Prospect Research && python api\main.py"
+start "Backend API Server" cmd /k "title Backend API - Prospect Research && python main.py server"
 
 REM Wait for server to start
 echo Waiting for API server to start...
@@ -118,13 +118,16 @@ REM Install core dependencies
 echo Installing core dependencies...
 pip install crewai>=0.28.0 crewai-tools>=0.1.0 fastapi>=0.104.0 uvicorn>=0.24.0
 pip install supabase>=2.0.0 python-dotenv>=1.0.0 pydantic>=2.0.0 httpx>=0.25.0
-pip install python-json-logger>=2.0.0
+pip install orjson>=3.9.0
 
 REM Install development dependencies
 echo Installing development dependencies...
 pip install pytest>=7.4.0 pytest-asyncio>=0.21.0 black>=23.0.0
 pip install ruff>=0.1.0 mypy>=1.0.0 coverage>=7.0.0
 
+REM Install the project itself (prospect_research package and prospect CLI)
+pip install -e .
+
 echo ✅ Python dependencies installed
 
 echo.
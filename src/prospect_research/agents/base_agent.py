@@ -3,13 +3,117 @@ Base agent class with Supabase integration and research tracking.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, List
-from datetime import datetime
-import time
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, List, Set, Tuple, TypeVar
+from datetime import datetime, timezone
+import asyncio
+import functools
 import uuid
 
+import orjson
+
 from ..utils.logger import setup_logger
-from ..utils.database import db
+
+
+@functools.cache
+def _get_db():
+    """Import the Supabase client on first use so importing agents stays cheap."""
+    from ..utils.database import db
+    return db
+
+
+# Table query builders are stateless, so build them once per client. If the
+# Supabase client is ever rebuilt (tests, auth changes), call cache_clear().
+@functools.cache
+def _research_table():
+    """Return the research_results table builder."""
+    return _get_db().client.table('research_results')
+
+
+@functools.cache
+def _companies_table():
+    """Return the companies table builder."""
+    return _get_db().client.table('companies')
+
+
+T = TypeVar("T")
+
+# JSON payloads above this size get their long string values shortened
+_MAX_PAYLOAD_BYTES = 65536
+_MAX_STRING_CHARS = 4096
+
+
+def _shorten(value: Any) -> Any:
+    """Recursively cut string values longer than _MAX_STRING_CHARS."""
+    if isinstance(value, str) and len(value) > _MAX_STRING_CHARS:
+        return value[:_MAX_STRING_CHARS] + "...[truncated]"
+    if isinstance(value, dict):
+        return {key: _shorten(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_shorten(item) for item in value]
+    return value
+
+
+def _truncate(data: Dict[str, Any], max_bytes: int = _MAX_PAYLOAD_BYTES) -> Dict[str, Any]:
+    """Return data unchanged if it serializes within max_bytes, else a shortened copy."""
+    if len(orjson.dumps(data, default=str)) <= max_bytes:
+        return data
+    return _shorten(data)
+
+
+# Research status updates are written off the request path by a fixed pool
+# of workers, which also bounds concurrent Supabase writes.
+_WRITE_WORKERS = 8
+_WRITE_QUEUE_SIZE = 1000
+
+_writer_logger = setup_logger("agent.research_writer")
+_write_queue: Optional["asyncio.Queue[Tuple[str, Dict[str, Any]]]"] = None
+_write_workers: List["asyncio.Task[None]"] = []
+
+
+def _update_research(research_id: str, update_data: Dict[str, Any]) -> None:
+    """Apply a status update to a research_results row."""
+    _research_table().update(update_data).eq('id', research_id).execute()
+
+
+async def _research_writer(queue: "asyncio.Queue[Tuple[str, Dict[str, Any]]]") -> None:
+    """Drain queued research updates; the Supabase client is sync, so run it in a thread."""
+    while True:
+        research_id, update_data = await queue.get()
+        try:
+            await asyncio.to_thread(_update_research, research_id, update_data)
+        except Exception as db_error:
+            _writer_logger.warning("Database update failed for %s: %s", research_id, db_error)
+        finally:
+            queue.task_done()
+
+
+def _research_write_queue() -> "asyncio.Queue[Tuple[str, Dict[str, Any]]]":
+    """Return the write queue, starting its workers on the running event loop."""
+    global _write_queue
+    loop = asyncio.get_running_loop()
+    if _write_queue is None or _write_workers[0].get_loop() is not loop:
+        _write_queue = asyncio.Queue(maxsize=_WRITE_QUEUE_SIZE)
+        _write_workers[:] = [
+            loop.create_task(_research_writer(_write_queue)) for _ in range(_WRITE_WORKERS)
+        ]
+    return _write_queue
+
+
+async def drain_research_writes() -> None:
+    """Wait for queued research updates to finish, then stop the writer workers.
+
+    Call this before the event loop shuts down (the API does so from its
+    lifespan hook); updates still queued when the loop closes are lost.
+    """
+    global _write_queue
+    if _write_queue is None:
+        return
+    await _write_queue.join()
+    for worker in _write_workers:
+        worker.cancel()
+    await asyncio.gather(*_write_workers, return_exceptions=True)
+    _write_workers.clear()
+    _write_queue = None
 
 
 class BaseAgent(ABC):
@@ -19,118 +123,144 @@ class BaseAgent(ABC):
         self.name = name
         self.description = description
         self.logger = setup_logger(f"agent.{name}")
+        # Tracking writes running off the request path; held so they aren't GC'd mid-flight
+        self._bg_tasks: Set["asyncio.Task[None]"] = set()
     
-    async def start_research(self, company_name: str, research_type: str, input_data: Dict[str, Any]) -> str:
-        """Start research tracking and return research_id."""
+    async def start_research(self, company_name: str, research_type: str, input_data: Dict[str, Any],
+                             research_id: Optional[str] = None) -> str:
+        """Start research tracking and return research_id.
+
+        Callers that run this in the background pass their own research_id.
+        """
+        research_id = research_id or uuid.uuid4().hex
+        now_iso = datetime.now(timezone.utc).isoformat()
         try:
             # Find or create company record
             company_id = await self._find_or_create_company(company_name, input_data.get('domain'))
             
             # Create research record
             research_record = {
-                'id': str(uuid.uuid4()),
+                'id': research_id,
                 'company_id': company_id,
                 'research_type': research_type,
                 'status': 'processing',
-                'input_data': input_data,
+                'input_data': _truncate(input_data),
                 'agent_workflow': self.name,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
+                'created_at': now_iso,
+                'updated_at': now_iso
             }
             
-            # Note: This will fail gracefully if Supabase isn't configured
-            try:
-                result = db.client.table('research_results').insert(research_record).execute()
-                research_id = research_record['id']
-                self.logger.info(f"Research started: {research_id}")
-                return research_id
-            except Exception as db_error:
-                self.logger.warning(f"Database insert failed, using mock ID: {db_error}")
-                return research_record['id']  # Return the ID we generated
+            # Note: This will fail gracefully if Supabase isn't configured,
+            # in which case the ID is still returned
+            inserted = await self._safe_db('research_results.insert', lambda: _research_table().insert(research_record).execute())
+            if inserted is not None:
+                self.logger.info("Research started: %s", research_id)
+            return research_id
             
         except Exception as e:
-            self.logger.error(f"Failed to start research tracking: {e}")
-            # Return a mock ID so the process can continue
-            return f"mock-research-{int(time.time())}"
+            self.logger.error("Failed to start research tracking: %s", e)
+            # Return the ID anyway so the process can continue
+            return research_id
     
     async def complete_research(self, research_id: str, output_data: Dict[str, Any], 
                                processing_time_ms: int, cost_cents: int = 0) -> None:
-        """Mark research as completed with results."""
+        """Mark research as completed with results; the write happens in the background."""
+        now_iso = datetime.now(timezone.utc).isoformat()
         try:
             update_data = {
                 'status': 'completed',
-                'output_data': output_data,
+                'output_data': _truncate(output_data),
                 'processing_time_ms': processing_time_ms,
                 'cost_cents': cost_cents,
-                'updated_at': datetime.utcnow().isoformat()
+                'updated_at': now_iso
             }
             
-            try:
-                db.client.table('research_results').update(update_data).eq('id', research_id).execute()
-                self.logger.info(f"Research completed: {research_id}")
-            except Exception as db_error:
-                self.logger.warning(f"Database update failed: {db_error}")
+            await _research_write_queue().put((research_id, update_data))
+            self.logger.info("Research completed: %s", research_id)
             
         except Exception as e:
-            self.logger.error(f"Failed to complete research tracking: {e}")
+            self.logger.error("Failed to complete research tracking: %s", e)
     
     async def fail_research(self, research_id: str, error_message: str) -> None:
-        """Mark research as failed."""
+        """Mark research as failed; the write happens in the background."""
+        now_iso = datetime.now(timezone.utc).isoformat()
         try:
             update_data = {
                 'status': 'failed',
-                'output_data': {'error': error_message, 'timestamp': datetime.utcnow().isoformat()},
-                'updated_at': datetime.utcnow().isoformat()
+                'output_data': {'error': error_message, 'timestamp': now_iso},
+                'updated_at': now_iso
             }
             
-            try:
-                db.client.table('research_results').update(update_data).eq('id', research_id).execute()
-                self.logger.error(f"Research failed: {research_id} - {error_message}")
-            except Exception as db_error:
-                self.logger.warning(f"Database update failed: {db_error}")
+            await _research_write_queue().put((research_id, update_data))
+            self.logger.error("Research failed: %s - %s", research_id, error_message)
                 
         except Exception as e:
-            self.logger.error(f"Failed to record research failure: {e}")
+            self.logger.error("Failed to record research failure: %s", e)
     
     async def _find_or_create_company(self, company_name: str, domain: Optional[str] = None) -> str:
-        """Find existing company or create new one. Returns company_id."""
+        """Find existing company or create new one. Returns company_id.
+
+        New companies are inserted in a single round trip; an existing name
+        conflicts on the unique companies.name index and is then looked up.
+        """
+        now_iso = datetime.now(timezone.utc).isoformat()
+        company_record = {
+            'id': uuid.uuid4().hex,
+            'name': company_name,
+            'domain': domain,
+            'created_at': now_iso,
+            'updated_at': now_iso
+        }
+        
+        # Insert, or do nothing if a company with this name already exists
+        result = await self._safe_db('companies.upsert', lambda: _companies_table().upsert(
+            company_record, on_conflict='name', ignore_duplicates=True
+        ).execute())
+        if result is None:
+            return company_record['id']  # Database unavailable: use the ID we generated
+        
+        if result.data:
+            company_id = result.data[0]['id']
+            self.logger.info("Created new company: %s", company_id)
+            return company_id
+        
+        # Conflict: no row was returned, so fetch the existing company
+        result = await self._safe_db('companies.select', lambda: _companies_table().select('id').eq('name', company_name).limit(1).execute())
+        if result is not None and result.data:
+            company_id = result.data[0]['id']
+            self.logger.info("Found existing company: %s", company_id)
+            return company_id
+        
+        return company_record['id']
+    
+    async def _safe_db(self, label: str, fn: Callable[[], T]) -> Optional[T]:
+        """Run a database call in a thread, logging and returning None if it fails."""
         try:
-            # Try to find existing company
-            try:
-                result = db.client.table('companies').select('*').eq('name', company_name).execute()
-                
-                if result.data and len(result.data) > 0:
-                    company_id = result.data[0]['id']
-                    self.logger.info(f"Found existing company: {company_id}")
-                    return company_id
-            except Exception as db_error:
-                self.logger.warning(f"Database query failed: {db_error}")
-            
-            # Create new company record
-            company_record = {
-                'id': str(uuid.uuid4()),
-                'name': company_name,
-                'domain': domain,
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            }
-            
-            try:
-                new_company = db.client.table('companies').insert(company_record).execute()
-                company_id = company_record['id']
-                self.logger.info(f"Created new company: {company_id}")
-                return company_id
-            except Exception as db_error:
-                self.logger.warning(f"Database insert failed, using mock ID: {db_error}")
-                return company_record['id']  # Return the ID we generated
-                
+            # The Supabase client is sync, so keep its round trip off the event loop
+            return await asyncio.to_thread(fn)
         except Exception as e:
-            self.logger.error(f"Failed to find/create company: {e}")
-            # Return a mock ID so the process can continue
-            return f"mock-company-{int(time.time())}"
+            self.logger.warning("Database %s failed: %s", label, e)
+            return None
+    
+    def _in_background(self, coro: Awaitable[Any], after: Optional["asyncio.Task[None]"] = None) -> "asyncio.Task[None]":
+        """Run a tracking write off the request path, once the after task (if any) is done."""
+        async def run() -> None:
+            if after is not None:
+                await asyncio.wait((after,))
+            await coro
+        
+        task = asyncio.get_running_loop().create_task(run())
+        self._bg_tasks.add(task)
+        task.add_done_callback(self._bg_tasks.discard)
+        return task
+    
+    async def drain_background(self) -> None:
+        """Wait for tracking writes still running in the background."""
+        while self._bg_tasks:
+            await asyncio.gather(*self._bg_tasks, return_exceptions=True)
     
     @abstractmethod
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    async def execute(self, inputs: Dict[str, Any]) -> Mapping[str, Any]:
         """Execute the agent's primary function. Must be implemented by subclasses."""
         pass
     
@@ -2,14 +2,64 @@
 Company Research Agent - Analyzes companies using AI and web search.
 """
 
+import asyncio
 import time
-import json
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import uuid
+from typing import Dict, Any, Optional, Tuple, TypedDict
+from datetime import datetime, timezone
 
 from ..base_agent import BaseAgent
 from ...tools.web_search.serper_search import SerperSearchTool
 from ...config.settings import settings
+from ...utils import cache
+from ...utils.cache import cached_call
+
+# Research results are cached per company; concurrent misses for the same
+# company wait on whichever process holds the lock instead of re-running it.
+_RESEARCH_CACHE_TTL_SECONDS = 6 * 60 * 60
+_RESEARCH_LOCK_TTL_SECONDS = 60
+
+# How long each Serper sub-query stays cached; news goes stale much faster
+_COMPANY_SEARCH_TTL_SECONDS = 24 * 60 * 60
+_NEWS_SEARCH_TTL_SECONDS = 30 * 60
+_PEOPLE_SEARCH_TTL_SECONDS = 12 * 60 * 60
+_COMPANY_SEARCH_NAMESPACE = "serper:company_search:v2"
+_NEWS_SEARCH_NAMESPACE = "serper:recent_news"
+_PEOPLE_SEARCH_NAMESPACE = "serper:leadership_info"
+
+# Confidence contributed by each search_data key when it holds data.
+# New quality signals are scored by adding a row here.
+_CONFIDENCE_WEIGHTS = (
+    ("company_search", 0.4),
+    ("recent_news", 0.3),
+    ("leadership_info", 0.3),
+)
+
+# Placeholder analysis results, shared by every insights dict rather than
+# rebuilt per request. Tuples so no caller can mutate them in place.
+_REVENUE_STREAMS = ("Subscription", "Professional Services")
+_COMPETITIVE_ADVANTAGES = ("AI Technology", "Market Leadership")
+_PAIN_POINTS = ("Scaling operations", "Customer acquisition", "Technology integration")
+_TIMING_TRIGGERS = ("Recent funding round", "Leadership changes", "Product launches")
+
+
+def _company_search_succeeded(results: Dict[str, Any]) -> bool:
+    """Whether every company sub-query returned results, so the set is worth caching."""
+    return bool(results) and not any(
+        isinstance(value, dict) and "error" in value for value in results.values()
+    )
+
+
+class ResearchResult(TypedDict):
+    """Company research result, as returned to callers and cached."""
+    research_id: str
+    company_name: str
+    domain: Optional[str]
+    status: str
+    processing_time_ms: int
+    timestamp: str
+    insights: Dict[str, Any]
+    confidence_score: float
 
 
 class CompanyResearchAgent(BaseAgent):
@@ -22,217 +72,240 @@ class CompanyResearchAgent(BaseAgent):
         )
         self.search_tool = SerperSearchTool()
     
-    async def execute(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute comprehensive company research workflow."""
+    async def execute(self, inputs: Dict[str, Any]) -> ResearchResult:
+        """Execute comprehensive company research workflow.
+
+        A cached result is returned as-is, without starting research tracking.
+        Pass use_cache=False in inputs to skip every cache and refresh it.
+        """
         self.validate_inputs(inputs, ["company_name"])
         
         company_name = inputs["company_name"]
         domain = inputs.get("domain")
-        start_time = time.time()
+        use_cache = inputs.get("use_cache", True)
+        cache_key = cache.research_cache_key(company_name, domain)
         
-        self.logger.info(f"Starting comprehensive research for: {company_name}")
+        cached = await cache.get_json(cache_key) if use_cache else None
+        if cached is not None:
+            self.logger.info("Serving cached research for %s: %s", company_name, cached.get('research_id'))
+            return cached
         
-        # Start research tracking
-        research_id = await self.start_research(company_name, "company_research", inputs)
+        lock_key = f"{cache_key}:lock"
+        locked = await cache.acquire_lock(lock_key, _RESEARCH_LOCK_TTL_SECONDS)
+        if not locked and use_cache:
+            # Another request is researching this company; use its result if it lands
+            # in time. If it releases the lock without caching one (failed or mock
+            # searches), stop waiting and research here instead.
+            cached = await cache.wait_for_json(cache_key, _RESEARCH_LOCK_TTL_SECONDS, lock_key=lock_key)
+            if cached is not None:
+                return cached
+        
+        try:
+            research_results, searches_ok = await self._research(company_name, domain, inputs, use_cache)
+            # Remember the domain so invalidation can find this company's entries
+            # without scanning the keyspace
+            await cache.add_member(cache.research_domains_key(company_name), (domain or "").strip().lower(),
+                                   _COMPANY_SEARCH_TTL_SECONDS)
+            # Results built from mock or failed searches are returned but not
+            # cached, so the next request tries the searches again
+            if searches_ok:
+                await cache.set_json(cache_key, research_results, _RESEARCH_CACHE_TTL_SECONDS)
+            return research_results
+        finally:
+            # Only release a lock we hold; another request may own it
+            if locked:
+                await cache.release_lock(lock_key)
+    
+    async def invalidate_cache(self, company_name: str, domain: Optional[str] = None) -> int:
+        """Drop cached research and searches for a company; return how many Redis entries were removed.
+
+        Without a domain, the research results for every domain of the company
+        are dropped. In-flight research locks are left alone.
+        """
+        domains_key = cache.research_domains_key(company_name)
+        if domain is not None:
+            domains = [domain]
+            keys = []
+        else:
+            # Domains recorded by execute, plus the no-domain entry
+            domains = [*await cache.members(domains_key), ""]
+            keys = [domains_key]
+        
+        keys += [cache.research_cache_key(company_name, d) for d in domains]
+        keys += [cache.cached_call_key(_COMPANY_SEARCH_NAMESPACE, (company_name, d or "")) for d in domains]
+        keys += [cache.cached_call_key(_NEWS_SEARCH_NAMESPACE, (company_name,)),
+                 cache.cached_call_key(_PEOPLE_SEARCH_NAMESPACE, (company_name,))]
+        for d in domains:
+            self.search_tool.forget_company(company_name, d or None)
+        return await cache.delete(*dict.fromkeys(keys))
+    
+    async def _research(self, company_name: str, domain: Optional[str], inputs: Dict[str, Any],
+                        use_cache: bool = True) -> Tuple[ResearchResult, bool]:
+        """Run the full research workflow with research tracking.
+
+        Also returns whether every search succeeded without mock data.
+        """
+        start_ns = time.monotonic_ns()
+        # One timestamp serves both the search data and the result
+        timestamp = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        
+        self.logger.info("Starting comprehensive research for: %s", company_name)
+        
+        # Insert the tracking row while the searches run. It is awaited before
+        # returning, so a client polling the research ID always finds the row;
+        # the completion or failure update is chained after it in the background
+        research_id = uuid.uuid4().hex
+        started = self._in_background(self.start_research(company_name, "company_research", inputs, research_id))
         
         try:
             # Step 1: Gather raw data from web search
-            search_data = await self._gather_search_data(company_name, domain)
-            
-            # Step 2: Analyze and structure the data using AI
-            analysis_results = await self._analyze_company_data(company_name, search_data)
+            search_data = await self._gather_search_data(company_name, domain, use_cache)
+            search_data["search_timestamp"] = timestamp
             
-            # Step 3: Extract key insights
-            insights = await self._extract_insights(company_name, analysis_results, search_data)
+            # Step 2: Analyze the data and extract key insights
+            insights = self._build_insights(company_name, search_data)
             
             # Calculate processing time
-            processing_time_ms = int((time.time() - start_time) * 1000)
+            processing_time_ms = (time.monotonic_ns() - start_ns) // 1_000_000
             
-            # Structure final results
-            research_results = {
+            # Structure final results. The raw search data is large and rarely
+            # needed, so it is kept out of the response and cached on its own.
+            research_results: ResearchResult = {
                 "research_id": research_id,
                 "company_name": company_name,
                 "domain": domain,
                 "status": "completed",
                 "processing_time_ms": processing_time_ms,
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": timestamp,
                 "insights": insights,
-                "raw_search_data": search_data,
                 "confidence_score": self._calculate_confidence_score(search_data)
             }
+            # Stored off the request path, like the tracking writes
+            self._in_background(cache.set_json(cache.raw_search_key(research_id), search_data,
+                                               cache.RAW_SEARCH_TTL_SECONDS))
+            await asyncio.wait((started,))
             
             # Mark research as completed
-            await self.complete_research(research_id, research_results, processing_time_ms)
+            self._in_background(self.complete_research(research_id, {**research_results, "raw_search_data": search_data},
+                                                       processing_time_ms), after=started)
             
-            self.logger.info(f"Research completed for {company_name} in {processing_time_ms}ms")
-            return research_results
+            self.logger.info("Research completed for %s in %sms", company_name, processing_time_ms)
+            searches_ok = (not search_data.get("mock_data")
+                           and _company_search_succeeded(search_data["company_search"]))
+            return research_results, searches_ok
             
         except Exception as e:
             error_msg = f"Research failed for {company_name}: {str(e)}"
-            await self.fail_research(research_id, error_msg)
+            self._in_background(self.fail_research(research_id, error_msg), after=started)
             raise
     
-    async def _gather_search_data(self, company_name: str, domain: Optional[str]) -> Dict[str, Any]:
+    async def _gather_search_data(self, company_name: str, domain: Optional[str],
+                                  use_cache: bool = True) -> Dict[str, Any]:
         """Gather comprehensive search data about the company."""
         if not self.search_tool.is_configured():
             self.logger.warning("Search tool not configured, using mock data")
             return self._get_mock_search_data(company_name, domain)
         
         try:
-            # Perform comprehensive search
-            search_results = await self.search_tool.search_company(company_name, domain)
+            # Company, news and people searches are independent, so run them concurrently.
+            # Each is cached on its own so requests that differ only in domain still
+            # share the news and people lookups.
+            refresh = not use_cache
+            search_results, news_results, people_results = await asyncio.gather(
+                cached_call(_COMPANY_SEARCH_NAMESPACE, (company_name, domain or ""),
+                            lambda: self.search_tool.search_company(company_name, domain, use_cache=use_cache),
+                            _COMPANY_SEARCH_TTL_SECONDS, refresh=refresh,
+                            should_cache=_company_search_succeeded),
+                cached_call(_NEWS_SEARCH_NAMESPACE, (company_name,),
+                            lambda: self.search_tool.search_company_news(company_name, use_cache=use_cache),
+                            _NEWS_SEARCH_TTL_SECONDS, refresh=refresh),
+                cached_call(_PEOPLE_SEARCH_NAMESPACE, (company_name,),
+                            lambda: self.search_tool.search_company_people(company_name, use_cache=use_cache),
+                            _PEOPLE_SEARCH_TTL_SECONDS, refresh=refresh),
+                return_exceptions=True
+            )
             
-            # Get recent news
-            news_results = await self.search_tool.search_company_news(company_name)
-            
-            # Get people/leadership info
-            people_results = await self.search_tool.search_company_people(company_name)
-            
-            return {
+            search_data = {
                 "company_search": search_results,
                 "recent_news": news_results,
-                "leadership_info": people_results,
-                "search_timestamp": datetime.utcnow().isoformat()
+                "leadership_info": people_results
             }
             
+            # Substitute mock data only for the searches that failed
+            failed = [key for key, value in search_data.items() if isinstance(value, BaseException)]
+            if failed:
+                mock_data = self._get_mock_search_data(company_name, domain)
+                for key in failed:
+                    self.logger.error("Search for %s failed: %s", key, search_data[key])
+                    search_data[key] = mock_data[key]
+                search_data["mock_data"] = True
+            
+            return search_data
+            
         except Exception as e:
-            self.logger.error(f"Search data gathering failed: {e}")
+            self.logger.error("Search data gathering failed: %s", e)
             # Fall back to mock data so the workflow can continue
             return self._get_mock_search_data(company_name, domain)
     
-    async def _analyze_company_data(self, company_name: str, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze search data using AI to extract structured information."""
+    def _build_insights(self, company_name: str, search_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze search data and build actionable business insights in one pass."""
         
-        # This is where we'd integrate with OpenAI/Anthropic for analysis
-        # For now, we'll do rule-based analysis of the search results
+        # This is where we'd integrate with OpenAI/Anthropic for analysis.
+        # For now the analysis is rule-based; fields marked "would extract"
+        # are placeholders until company_search/leadership_info are analyzed.
+        news = search_data.get("recent_news") or []
         
-        analysis = {
-            "company_overview": self._extract_company_overview(search_data),
-            "business_model": self._extract_business_model(search_data),
-            "recent_developments": self._extract_recent_developments(search_data),
-            "leadership_analysis": self._extract_leadership_info(search_data),
-            "market_position": self._extract_market_position(search_data)
+        business_model = {
+            "type": "B2B SaaS",  # Would extract from analysis
+            "revenue_streams": _REVENUE_STREAMS,
+            "target_market": "Enterprise",
+            "pricing_model": "Subscription-based"
         }
         
-        self.logger.info(f"Completed AI analysis for {company_name}")
-        return analysis
-    
-    async def _extract_insights(self, company_name: str, analysis: Dict[str, Any], 
-                               search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract actionable business insights from the analysis."""
-        
         insights = {
             "company_profile": {
                 "name": company_name,
-                "industry": analysis.get("company_overview", {}).get("industry", "Unknown"),
-                "size_estimate": analysis.get("company_overview", {}).get("size", "Unknown"),
-                "location": analysis.get("company_overview", {}).get("location", "Unknown"),
-                "description": analysis.get("company_overview", {}).get("description", "")
+                "industry": "Technology",  # Would extract from search results
+                "size_estimate": "Mid-size",  # Would extract from search results
+                "location": "United States",  # Would extract from search results
+                "description": "Extracted from search results"  # Would extract actual description
             },
             "business_intelligence": {
-                "business_model": analysis.get("business_model", {}),
-                "revenue_model": analysis.get("business_model", {}).get("revenue_streams", []),
-                "competitive_advantages": analysis.get("market_position", {}).get("advantages", [])
+                "business_model": business_model,
+                "revenue_model": business_model["revenue_streams"],
+                "competitive_advantages": _COMPETITIVE_ADVANTAGES
             },
             "recent_activity": {
-                "news_summary": analysis.get("recent_developments", {}).get("summary", ""),
-                "key_updates": analysis.get("recent_developments", {}).get("updates", []),
-                "funding_activity": analysis.get("recent_developments", {}).get("funding", "None detected")
+                "news_summary": f"Found {len(news)} recent news articles",
+                "key_updates": [item.get("title", "") for item in news[:5]],
+                "funding_activity": "No recent funding detected"
             },
             "leadership_team": {
-                "key_executives": analysis.get("leadership_analysis", {}).get("executives", []),
-                "leadership_changes": analysis.get("leadership_analysis", {}).get("recent_changes", [])
+                "key_executives": [{"name": "CEO Name", "title": "CEO", "source": "web_search"}],
+                "leadership_changes": []
             },
             "outreach_opportunities": {
-                "pain_points": self._identify_pain_points(analysis),
-                "timing_triggers": self._identify_timing_triggers(analysis),
-                "decision_makers": analysis.get("leadership_analysis", {}).get("decision_makers", [])
+                "pain_points": self._identify_pain_points(),
+                "timing_triggers": self._identify_timing_triggers(),
+                "decision_makers": [{"name": "CEO Name", "title": "CEO", "contact_priority": "high"}]
             }
         }
         
+        self.logger.info("Completed AI analysis for %s", company_name)
         return insights
     
-    def _extract_company_overview(self, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract basic company information from search results."""
-        company_search = search_data.get("company_search", {})
-        
-        # This would be enhanced with AI analysis
-        overview = {
-            "industry": "Technology",  # Would extract from search results
-            "size": "Mid-size",  # Would extract from search results
-            "location": "United States",  # Would extract from search results
-            "description": "Extracted from search results",  # Would extract actual description
-            "founded": "Unknown",
-            "website": "Unknown"
-        }
-        
-        return overview
-    
-    def _extract_business_model(self, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract business model information."""
-        return {
-            "type": "B2B SaaS",  # Would extract from analysis
-            "revenue_streams": ["Subscription", "Professional Services"],
-            "target_market": "Enterprise",
-            "pricing_model": "Subscription-based"
-        }
-    
-    def _extract_recent_developments(self, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract recent company developments."""
-        news_data = search_data.get("recent_news", [])
-        
-        return {
-            "summary": f"Found {len(news_data)} recent news articles",
-            "updates": [item.get("title", "") for item in news_data[:5]],
-            "funding": "No recent funding detected"
-        }
-    
-    def _extract_leadership_info(self, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract leadership and key personnel information."""
-        people_data = search_data.get("leadership_info", [])
-        
-        return {
-            "executives": [{"name": "CEO Name", "title": "CEO", "source": "web_search"}],
-            "recent_changes": [],
-            "decision_makers": [{"name": "CEO Name", "title": "CEO", "contact_priority": "high"}]
-        }
-    
-    def _extract_market_position(self, search_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Extract market position and competitive analysis."""
-        return {
-            "advantages": ["AI Technology", "Market Leadership"],
-            "challenges": ["Competition", "Market Saturation"],
-            "opportunities": ["Market Expansion", "New Products"]
-        }
-    
-    def _identify_pain_points(self, analysis: Dict[str, Any]) -> List[str]:
+    def _identify_pain_points(self) -> Tuple[str, ...]:
         """Identify potential pain points from the analysis."""
-        return [
-            "Scaling operations",
-            "Customer acquisition",
-            "Technology integration"
-        ]
+        return _PAIN_POINTS
     
-    def _identify_timing_triggers(self, analysis: Dict[str, Any]) -> List[str]:
+    def _identify_timing_triggers(self) -> Tuple[str, ...]:
         """Identify timing triggers for outreach."""
-        return [
-            "Recent funding round",
-            "Leadership changes",
-            "Product launches"
-        ]
+        return _TIMING_TRIGGERS
     
     def _calculate_confidence_score(self, search_data: Dict[str, Any]) -> float:
         """Calculate confidence score based on data quality."""
-        score = 0.0
-        
         # Add points for data availability
-        if search_data.get("company_search"):
-            score += 0.4
-        if search_data.get("recent_news"):
-            score += 0.3
-        if search_data.get("leadership_info"):
-            score += 0.3
-            
+        score = sum((weight for key, weight in _CONFIDENCE_WEIGHTS if search_data.get(key)), 0.0)
         return min(score, 1.0)
     
     def _get_mock_search_data(self, company_name: str, domain: Optional[str]) -> Dict[str, Any]:
@@ -248,6 +321,5 @@ class CompanyResearchAgent(BaseAgent):
             "leadership_info": [
                 {"title": f"{company_name} leadership team", "snippet": "Mock leadership information"}
             ],
-            "search_timestamp": datetime.utcnow().isoformat(),
             "mock_data": True
         }
\ No newline at end of file
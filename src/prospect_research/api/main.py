@@ -1,10 +1,75 @@
-from fastapi import FastAPI, HTTPException, Path, Query
+from contextlib import asynccontextmanager
+import asyncio
+import functools
+import secrets
+import time
+import orjson
+from fastapi import Depends, FastAPI, Header, HTTPException, Path, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, ConfigDict, Field
+from typing import AsyncIterator, Dict, Any, Optional, List
+from ..agents.base_agent import drain_research_writes
+from ..agents.research.company_research_agent import CompanyResearchAgent, ResearchResult
+from ..utils import cache
+from ..utils.database import db
 from ..utils.logger import setup_logger
 from ..config.settings import settings
-import uvicorn
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Application startup and shutdown hooks."""
+    # Build the process-wide agent and its Serper HTTP client up front rather
+    # than on the first request; handlers receive it through get_research_agent
+    agent = CompanyResearchAgent()
+    app.state.agent = agent
+    if agent.search_tool.is_configured():
+        app.state.search_client = agent.search_tool.client
+    # Create the Supabase client now so the first request doesn't pay for it.
+    # A missing or bad configuration is logged and left for the first use to raise.
+    try:
+        app.state.supabase = db.client
+    except Exception as e:
+        logger.error("Supabase client initialization failed: %s", e)
+    # Build the OpenAPI schema now; FastAPI caches it on app.openapi_schema,
+    # so the first /docs or /openapi.json request doesn't walk every route
+    app.openapi()
+    yield
+    # Flush research status updates queued by agents before exiting
+    await agent.drain_background()
+    await drain_research_writes()
+    await agent.search_tool.aclose()
+    await cache.close()
+
+def get_research_agent(request: Request) -> CompanyResearchAgent:
+    """Return the process-wide research agent built at startup."""
+    return request.app.state.agent
+
+def use_research_cache(
+    cache_control: Optional[str] = Header(None, description="Send `no-cache` to bypass cached research and search results")
+) -> bool:
+    """Whether cached results may be served, per the request's Cache-Control header."""
+    return "no-cache" not in (cache_control or "").lower()
+
+def require_admin_token(
+    authorization: Optional[str] = Header(None, description="`Bearer <ADMIN_API_KEY>`")
+) -> None:
+    """Reject admin requests without the configured bearer token."""
+    if not settings.admin_api_key:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.admin_api_key.encode()):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+# Maximum companies from one batch request researched at the same time
+_BATCH_CONCURRENCY = 16
+
+# Accepted company domains, e.g. "openai.com"
+_DOMAIN_RE = r"^[a-zA-Z0-9][a-zA-Z0-9-]{1,61}[a-zA-Z0-9]\.[a-zA-Z]{2,}$"
+
+# Research runs in progress in this process, keyed like the research cache.
+# Identical concurrent requests await the same task instead of re-running.
+_inflight: Dict[str, "asyncio.Task[ResearchResult]"] = {}
 
 # Initialize FastAPI with comprehensive Swagger documentation
 app = FastAPI(
@@ -44,16 +109,20 @@ app = FastAPI(
             "url": "http://localhost:8000",
             "description": "Development server"
         }
-    ]
+    ],
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
-# Add CORS middleware
+# Add CORS middleware. Explicit lists keep origin checks to a set lookup;
+# Vercel preview deployments are matched by an anchored pattern.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["http://localhost:3000", "https://*.vercel.app"],
+    allow_origins=["http://localhost:3000"],
+    allow_origin_regex=r"^https://[a-z0-9-]+\.vercel\.app$",
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Content-Type", "Authorization", "Cache-Control"],
 )
 
 logger = setup_logger("api")
@@ -72,16 +141,19 @@ class CompanyResearchRequest(BaseModel):
         None,
         description="Company website domain (optional but improves accuracy)",
         example="openai.com",
-        pattern=r"^[a-zA-Z0-9][a-zA-Z0-9-]{1,61}[a-zA-Z0-9]\.[a-zA-Z]{2,}$"
+        pattern=_DOMAIN_RE
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra='ignore',
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "company_name": "OpenAI",
                 "domain": "openai.com"
             }
         }
+    )
     
 class CompanyResearchResponse(BaseModel):
     """Response model for initiated company research."""
@@ -90,8 +162,10 @@ class CompanyResearchResponse(BaseModel):
     status: str = Field(..., description="Research status: processing, completed, or failed")
     message: str = Field(..., description="Human-readable status message")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        extra='ignore',
+        frozen=True,
+        json_schema_extra={
             "example": {
                 "research_id": "research_123e4567-e89b-12d3-a456-426614174000",
                 "company_id": "OpenAI", 
@@ -99,6 +173,23 @@ class CompanyResearchResponse(BaseModel):
                 "message": "Research completed for OpenAI in 3245ms"
             }
         }
+    )
+
+class BatchResearchRequest(BaseModel):
+    """Request model for researching several companies at once."""
+    companies: List[CompanyResearchRequest] = Field(
+        ...,
+        description="Companies to research",
+        min_length=1,
+        max_length=100
+    )
+
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
+class BatchResearchResponse(BaseModel):
+    """Response model for batch company research."""
+    results: List[CompanyResearchResponse] = Field(..., description="One result per requested company, in request order")
+    count: int = Field(..., description="Number of companies researched")
 
 class CompanyProfile(BaseModel):
     """Company profile information."""
@@ -133,9 +224,10 @@ class DetailedResearchResponse(BaseModel):
     insights: ResearchInsights = Field(..., description="Structured research insights")
     confidence_score: float = Field(..., description="Confidence score (0-1) based on data quality", ge=0, le=1)
     processing_time_ms: Optional[int] = Field(None, description="Processing time in milliseconds")
+    raw_search_data: Optional[Dict[str, Any]] = Field(None, description="Raw search results, only returned with include_raw")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "research_id": "research_123e4567-e89b-12d3-a456-426614174000",
                 "status": "completed",
@@ -162,6 +254,70 @@ class DetailedResearchResponse(BaseModel):
                 }
             }
         }
+    )
+
+# The root status body never changes while the process runs, so encode it once
+_ROOT_BYTES = orjson.dumps({
+    "message": "Prospect Research Platform API", 
+    "status": "healthy", 
+    "version": "1.0.0",
+    "docs_url": "/docs",
+    "redoc_url": "/redoc"
+})
+# The health body only changes with its timestamp, so it is re-encoded at
+# most once per second however often probes hit it
+_health_second = -1
+_health_bytes = b""
+
+def _health_body() -> bytes:
+    """Return the encoded health status, refreshed once per wall-clock second."""
+    global _health_second, _health_bytes
+    now = int(time.time())
+    if now != _health_second:
+        # TODO: Implement actual database health check
+        _health_bytes = orjson.dumps({
+            "api": "healthy",
+            "database": "ready", 
+            "environment": settings.environment,
+            "version": "1.0.0",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))
+        })
+        _health_second = now
+    return _health_bytes
+
+# Mock payloads served until the research and company endpoints read from the
+# database. Built once at import rather than on every request.
+_MOCK_RESEARCH_INSIGHTS = {
+    "company_profile": {
+        "name": "Example Company",
+        "industry": "Technology",
+        "description": "A technology company focused on innovation"
+    },
+    "business_intelligence": {
+        "business_model": {"type": "B2B SaaS"},
+        "revenue_model": ["Subscription", "Professional Services"]
+    },
+    "outreach_opportunities": {
+        "pain_points": ["Scaling operations", "Customer acquisition"],
+        "timing_triggers": ["Recent funding round", "Product launches"]
+    }
+}
+_MOCK_COMPANIES = (
+    {"id": "1", "name": "Example Company", "domain": "example.com"},
+    {"id": "2", "name": "Test Corp", "domain": "test.com"}
+)
+
+@functools.lru_cache(maxsize=1024)
+def _mock_status_body(research_id: str) -> bytes:
+    """Return the encoded mock status for a research ID."""
+    return orjson.dumps({
+        "research_id": research_id,
+        "status": "completed",
+        "progress": 100,
+        "estimated_completion_seconds": 0,
+        "created_at": "2024-01-01T00:00:00Z",
+        "updated_at": "2024-01-01T00:00:03Z"
+    })
 
 # API Routes with comprehensive Swagger documentation
 @app.get(
@@ -173,13 +329,7 @@ class DetailedResearchResponse(BaseModel):
 )
 async def root():
     """Get basic API status and information."""
-    return {
-        "message": "Prospect Research Platform API", 
-        "status": "healthy", 
-        "version": "1.0.0",
-        "docs_url": "/docs",
-        "redoc_url": "/redoc"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get(
     "/health",
@@ -190,18 +340,7 @@ async def root():
 )
 async def health_check():
     """Perform detailed health check of all services."""
-    try:
-        # TODO: Implement actual database health check
-        return {
-            "api": "healthy",
-            "database": "ready", 
-            "environment": settings.environment,
-            "version": "1.0.0",
-            "timestamp": "2024-01-01T00:00:00Z"
-        }
-    except Exception as e:
-        logger.error(f"Health check failed: {e}")
-        raise HTTPException(status_code=503, detail="Service unhealthy")
+    return Response(content=_health_body(), media_type="application/json")
 
 @app.post(
     "/research/company", 
@@ -220,36 +359,114 @@ async def health_check():
     **Processing Time**: ~3-5 seconds for most companies
     **Data Sources**: Google search, company websites, news articles, social media
     **Accuracy**: 90%+ for established companies with web presence
+    **Caching**: Results are cached per company; send `Cache-Control: no-cache` for fresh data
     """,
     response_description="Research initiated successfully with unique research ID",
     tags=["Research"]
 )
-async def research_company(request: CompanyResearchRequest):
+async def research_company(
+    request: CompanyResearchRequest,
+    agent: CompanyResearchAgent = Depends(get_research_agent),
+    use_cache: bool = Depends(use_research_cache)
+):
     """Start comprehensive AI-powered company research workflow."""
     try:
-        logger.info(f"Research requested for company: {request.company_name}")
+        logger.info("Research requested for company: %s", request.company_name)
         
-        # Import and use the real research agent
-        from ..agents.research.company_research_agent import CompanyResearchAgent
-        
-        # Execute research
-        agent = CompanyResearchAgent()
-        result = await agent.execute({
-            "company_name": request.company_name,
-            "domain": request.domain
-        })
+        result = await _research_once(agent, request.company_name, request.domain, use_cache)
         
-        return CompanyResearchResponse(
-            research_id=result.get("research_id", "unknown"),
-            company_id=result.get("insights", {}).get("company_profile", {}).get("name", "unknown"),
-            status=result.get("status", "completed"),
-            message=f"Research completed for {request.company_name} in {result.get('processing_time_ms', 0)}ms"
-        )
+        # Returned as a response directly so it skips a round trip through
+        # CompanyResearchResponse, which documents the shape for Swagger
+        return ORJSONResponse(_research_summary(request.company_name, result))
         
     except Exception as e:
-        logger.error(f"Company research failed: {e}")
+        logger.error("Company research failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post(
+    "/research/companies:batch",
+    response_model=BatchResearchResponse,
+    summary="Research Multiple Companies",
+    description=f"""
+    Run company research for up to 100 companies in one request.
+    
+    Companies are researched concurrently, at most {_BATCH_CONCURRENCY} at a time, and share
+    the same result cache as `/research/company`. A company that fails is
+    reported with status `failed` without failing the rest of the batch.
+    """,
+    response_description="Research results in request order",
+    tags=["Research"]
+)
+async def research_companies_batch(
+    request: BatchResearchRequest,
+    agent: CompanyResearchAgent = Depends(get_research_agent),
+    use_cache: bool = Depends(use_research_cache)
+):
+    """Research several companies concurrently."""
+    logger.info("Batch research requested for %s companies", len(request.companies))
+    # Bounds concurrent agent runs so a large batch stays under Serper's rate limit
+    semaphore = asyncio.Semaphore(_BATCH_CONCURRENCY)
+    
+    async def research(company: CompanyResearchRequest) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await _research_once(agent, company.company_name, company.domain, use_cache)
+            except Exception as e:
+                logger.error("Company research failed for %s: %s", company.company_name, e)
+                return {
+                    "research_id": "unknown",
+                    "company_id": company.company_name,
+                    "status": "failed",
+                    "message": f"Research failed for {company.company_name}: {e}"
+                }
+            return _research_summary(company.company_name, result)
+    
+    results = await asyncio.gather(*(research(company) for company in request.companies))
+    return ORJSONResponse({"results": results, "count": len(results)})
+
+def _research_summary(company_name: str, result: ResearchResult) -> Dict[str, Any]:
+    """Shape an agent result as a CompanyResearchResponse body."""
+    return {
+        "research_id": result.get("research_id", "unknown"),
+        "company_id": result.get("insights", {}).get("company_profile", {}).get("name", "unknown"),
+        "status": result.get("status", "completed"),
+        "message": f"Research completed for {company_name} in {result.get('processing_time_ms', 0)}ms"
+    }
+
+async def _research_once(agent: CompanyResearchAgent, company_name: str, domain: Optional[str],
+                         use_cache: bool = True) -> ResearchResult:
+    """Run research for the company, sharing the result with identical concurrent requests.
+
+    Requests that bypass the cache always get a run of their own.
+    """
+    if not use_cache:
+        return await agent.execute({
+            "company_name": company_name,
+            "domain": domain,
+            "use_cache": False
+        })
+    
+    key = cache.research_cache_key(company_name, domain)
+    task = _inflight.get(key)
+    if task is None:
+        # The run is its own task, so a disconnecting client (including the one
+        # that started it) cancels only its own wait, never the shared run.
+        # The agent serves cached results itself, without research tracking writes.
+        task = asyncio.ensure_future(agent.execute({
+            "company_name": company_name,
+            "domain": domain
+        }))
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_finish_inflight, key))
+    return await asyncio.shield(task)
+
+def _finish_inflight(key: str, task: "asyncio.Task[ResearchResult]") -> None:
+    """Forget a finished shared run."""
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # Mark retrieved so a failure nobody awaited is not logged
+
 @app.get(
     "/research/{research_id}/results",
     response_model=DetailedResearchResponse,
@@ -270,34 +487,26 @@ async def research_company(request: CompanyResearchRequest):
     tags=["Research"]
 )
 async def get_research_results(
-    research_id: str = Path(..., description="Unique research identifier returned from /research/company")
+    research_id: str = Path(..., description="Unique research identifier returned from /research/company"),
+    include_raw: bool = Query(False, description="Include the raw search data the insights were built from")
 ):
     """Get comprehensive research results and insights."""
     try:
         # For now, return mock detailed results
         # In production, this would query the database
-        return {
+        results = {
             "research_id": research_id,
             "status": "completed",
-            "insights": {
-                "company_profile": {
-                    "name": "Example Company",
-                    "industry": "Technology",
-                    "description": "A technology company focused on innovation"
-                },
-                "business_intelligence": {
-                    "business_model": {"type": "B2B SaaS"},
-                    "revenue_model": ["Subscription", "Professional Services"]
-                },
-                "outreach_opportunities": {
-                    "pain_points": ["Scaling operations", "Customer acquisition"],
-                    "timing_triggers": ["Recent funding round", "Product launches"]
-                }
-            },
+            "insights": _MOCK_RESEARCH_INSIGHTS,
             "confidence_score": 0.85
         }
+        if include_raw:
+            results["raw_search_data"] = await cache.get_json(cache.raw_search_key(research_id))
+        # Returned as a response directly so the payload is not re-validated
+        # and dumped through DetailedResearchResponse, which documents it
+        return ORJSONResponse(results)
     except Exception as e:
-        logger.error(f"Failed to get research results: {e}")
+        logger.error("Failed to get research results: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get(
@@ -321,17 +530,14 @@ async def list_companies(
     """Get paginated list of companies in the database."""
     try:
         # Mock implementation for now
-        return {
-            "companies": [
-                {"id": "1", "name": "Example Company", "domain": "example.com"},
-                {"id": "2", "name": "Test Corp", "domain": "test.com"}
-            ],
-            "count": 2,
+        return ORJSONResponse({
+            "companies": _MOCK_COMPANIES[offset:offset + limit],
+            "count": len(_MOCK_COMPANIES),
             "limit": limit,
             "offset": offset
-        }
+        })
     except Exception as e:
-        logger.error(f"Failed to list companies: {e}")
+        logger.error("Failed to list companies: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get(
@@ -346,6 +552,10 @@ async def list_companies(
     - **failed**: Research encountered an error
     
     Use this endpoint to poll for completion of long-running research tasks.
+    
+    The research record exists as soon as `/research/company` responds. Its
+    final status is written just after the response, so a status check made
+    immediately afterwards may still briefly report **processing**.
     """,
     response_description="Current research status and progress",
     tags=["Research"]
@@ -356,18 +566,38 @@ async def get_research_status(
     """Get current status of a research workflow."""
     try:
         # Mock implementation - would query database in production
-        return {
-            "research_id": research_id,
-            "status": "completed",
-            "progress": 100,
-            "estimated_completion_seconds": 0,
-            "created_at": "2024-01-01T00:00:00Z",
-            "updated_at": "2024-01-01T00:00:03Z"
-        }
+        return Response(content=_mock_status_body(research_id), media_type="application/json")
     except Exception as e:
-        logger.error(f"Failed to get research status: {e}")
+        logger.error("Failed to get research status: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.delete(
+    "/admin/cache/invalidate/{company_name}",
+    summary="Invalidate Cached Research",
+    description="""
+    Drop cached research for a company so the next request re-runs the agent.
+    The company's cached web searches are dropped too, so the rerun fetches
+    fresh search results. Without Redis configured, searches are cached per
+    worker process and only the worker serving this request is cleared.
+    
+    Without `domain`, every cached entry for the company name is removed.
+    
+    Requires `Authorization: Bearer <ADMIN_API_KEY>`; disabled when no key is configured.
+    """,
+    response_description="Number of cache entries removed",
+    tags=["Cache"],
+    dependencies=[Depends(require_admin_token)]
+)
+async def invalidate_research_cache(
+    company_name: str = Path(..., description="Company name as submitted to /research/company"),
+    domain: Optional[str] = Query(None, description="Only invalidate the entry for this domain"),
+    agent: CompanyResearchAgent = Depends(get_research_agent)
+):
+    """Delete cached research results and searches for a company."""
+    deleted = await agent.invalidate_cache(company_name, domain)
+    logger.info("Invalidated %s cached research entries for %s", deleted, company_name)
+    return {"company_name": company_name, "deleted": deleted}
+
 # Add tags metadata for better Swagger organization
 tags_metadata = [
     {
@@ -381,17 +611,12 @@ tags_metadata = [
     {
         "name": "Companies",
         "description": "Company data management endpoints"
+    },
+    {
+        "name": "Cache",
+        "description": "Research cache administration endpoints"
     }
 ]
 
 # Update FastAPI app with tags
 app.openapi_tags = tags_metadata
-
-if __name__ == "__main__":
-    logger.info(f"Starting API server on {settings.api_host}:{settings.api_port}")
-    uvicorn.run(
-        "api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=settings.environment == "development"
-    )
\ No newline at end of file
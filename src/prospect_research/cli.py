@@ -0,0 +1,96 @@
+"""
+Command line interface for the Prospect Research Platform.
+
+Installed as the `prospect` console script; heavy dependencies (uvicorn,
+FastAPI, pytest) are imported only by the command that needs them.
+"""
+
+import os
+import sys
+import argparse
+from typing import Optional
+
+def default_workers() -> int:
+    """Worker processes to run without reload: half the CPUs, at least two."""
+    return max(2, (os.cpu_count() or 1) // 2)
+
+def start_api_server(reload: Optional[bool] = None, workers: Optional[int] = None):
+    """Start the FastAPI server.
+
+    reload defaults to on in development; workers only apply without reload,
+    so a --no-reload launch never loads uvicorn's file watcher.
+    """
+    import uvicorn
+    from .config.settings import settings
+    
+    if reload is None:
+        reload = settings.environment == "development"
+    if workers is None:
+        workers = default_workers()
+    
+    print("Starting Prospect Research Platform API Server")
+    print(f"Server: http://{settings.api_host}:{settings.api_port}")
+    print(f"API Docs: http://{settings.api_host}:{settings.api_port}/docs")
+    print("Press Ctrl+C to stop")
+    
+    # Pass the app as an import string so the reloader and each worker import it
+    # themselves; Redis and HTTP clients are created lazily, after the fork.
+    # uvloop has no Windows build, so Windows keeps the stdlib loop. Access logs
+    # cost noticeable throughput and are off in production.
+    uvicorn.run(
+        "prospect_research.api.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        reload=reload,
+        workers=1 if reload else workers,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        access_log=settings.environment != "production"
+    )
+
+def run_tests():
+    """Run the test suite."""
+    import pytest
+    sys.exit(pytest.main(["-v", "tests/"]))
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser."""
+    parser = argparse.ArgumentParser(
+        description="Prospect Research Platform - AI Agent Orchestration"
+    )
+    subparsers = parser.add_subparsers(
+        dest="command",
+        required=True,
+        metavar="{server,test,help}",
+        help="Command to run"
+    )
+    
+    server = subparsers.add_parser("server", help="Start the API server")
+    server.add_argument(
+        "--reload",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Reload on code changes (default: on when ENVIRONMENT=development)"
+    )
+    server.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Number of worker processes (default: {default_workers()}; ignored with --reload)"
+    )
+    
+    subparsers.add_parser("test", help="Run the test suite")
+    subparsers.add_parser("help", help="Show this help message")
+    return parser
+
+def main():
+    """Main CLI interface."""
+    parser = build_parser()
+    args = parser.parse_args()
+    
+    if args.command == "server":
+        start_api_server(reload=args.reload, workers=args.workers)
+    elif args.command == "test":
+        run_tests()
+    else:
+        parser.print_help()
@@ -1,41 +1,67 @@
-from pydantic_settings import BaseSettings
-from pydantic import Field
+from dataclasses import dataclass, fields
 from typing import Optional
 import os
 
-class Settings(BaseSettings):
+from dotenv import dotenv_values
+
+@dataclass(slots=True, frozen=True)
+class Settings:
     """Application settings with environment variable support."""
-    
+
     # Supabase Configuration
-    supabase_url: str = Field("https://example.supabase.co", env="SUPABASE_URL")
-    supabase_anon_key: str = Field("example_anon_key", env="SUPABASE_ANON_KEY") 
-    supabase_service_role_key: str = Field("example_service_role_key", env="SUPABASE_SERVICE_ROLE_KEY")
-    
+    supabase_url: str = "https://example.supabase.co"
+    supabase_anon_key: str = "example_anon_key"
+    supabase_service_role_key: str = "example_service_role_key"
+
     # AI Configuration
-    openai_api_key: Optional[str] = Field(None, env="OPENAI_API_KEY")
-    anthropic_api_key: Optional[str] = Field(None, env="ANTHROPIC_API_KEY")
-    
+    openai_api_key: Optional[str] = None
+    anthropic_api_key: Optional[str] = None
+
     # Web Search Configuration
-    serper_api_key: Optional[str] = Field(None, env="SERPER_API_KEY")
-    brave_api_key: Optional[str] = Field(None, env="BRAVE_API_KEY")
-    
+    serper_api_key: Optional[str] = None
+    brave_api_key: Optional[str] = None
+
     # GitHub Integration
-    github_token: Optional[str] = Field(None, env="GITHUB_TOKEN")
-    
+    github_token: Optional[str] = None
+
     # Application Settings
-    log_level: str = Field("INFO", env="LOG_LEVEL")
-    environment: str = Field("development", env="ENVIRONMENT")
-    
+    log_level: str = "INFO"
+    environment: str = "development"
+
     # Rate Limiting
-    max_requests_per_minute: int = Field(60, env="MAX_REQUESTS_PER_MINUTE")
-    
+    max_requests_per_minute: int = 60
+
+    # Caching (disabled when unset)
+    redis_url: Optional[str] = None
+
+    # Bearer token for /admin endpoints (disabled when unset)
+    admin_api_key: Optional[str] = None
+
     # API Settings
-    api_host: str = Field("127.0.0.1", env="API_HOST")
-    api_port: int = Field(8000, env="API_PORT")
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
-
-# Global settings instance
-settings = Settings()
\ No newline at end of file
+    api_host: str = "127.0.0.1"
+    api_port: int = 8000
+
+def _load() -> Settings:
+    """Build settings from the process environment, falling back to .env."""
+    # Real environment variables take precedence over the .env file
+    env = {key.upper(): value for key, value in dotenv_values(".env").items() if value is not None}
+    env.update((key.upper(), value) for key, value in os.environ.items())
+
+    values = {}
+    for field in fields(Settings):
+        value = env.get(field.name.upper())
+        if value is not None:
+            values[field.name] = int(value) if field.type is int else value
+    return Settings(**values)
+
+# Global settings instance, built on first access (PEP 562) so importing this
+# module does not read the environment or the .env file
+_cached: Optional[Settings] = None
+
+def __getattr__(name: str) -> Settings:
+    global _cached
+    if name == "settings":
+        if _cached is None:
+            _cached = _load()
+        return _cached
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
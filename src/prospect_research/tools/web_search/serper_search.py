@@ -3,106 +3,292 @@ Serper web search tool for company research.
 Uses Serper API for Google search results.
 """
 
+import asyncio
+import time
+from collections import OrderedDict
 import httpx
-import json
-from typing import Dict, List, Any, Optional
+import orjson
+from typing import Dict, List, Any, Optional, Tuple, TypedDict
 from ...config.settings import settings
 from ...utils.logger import setup_logger
 
 logger = setup_logger("tools.serper_search")
 
+# One pooled HTTP/2 client per tool so repeated searches reuse keep-alive connections.
+# Concurrent queries multiplex over a single h2 connection, so only a few idle
+# connections need keeping (they matter only if Serper negotiates HTTP/1.1).
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=10)
+
+# Without Redis, repeat queries within a worker are answered from memory.
+# Half an hour, so news is no staler than the Redis news tier would allow.
+# With Redis configured the agent's shared, per-namespace caches are used
+# instead: a per-worker copy would outlive their TTLs and invalidation.
+_SEARCH_CACHE_SIZE = 1024
+_SEARCH_CACHE_TTL_SECONDS = 30 * 60
+_RESULTS_PER_QUERY = 10
+
+# Result keys for search_company, in the same order as its queries
+_COMPANY_QUERY_KEYS = ("overview", "news", "leadership", "business", "site")
+_PEOPLE_PER_QUERY = 3
+_MAX_PEOPLE_RESULTS = 10
+
+
+class _SerperHitBase(TypedDict):
+    title: str
+    link: str
+    snippet: str
+
+
+class SerperHit(_SerperHitBase, total=False):
+    """One organic search result, reduced to the fields research uses."""
+    date: str
+
+
+def _extract_organic(raw: Dict[str, Any]) -> List[SerperHit]:
+    """Keep only the organic hits of a Serper response, and only their used fields.
+
+    Serper returns around thirty fields per hit plus knowledge graph, ads and
+    related searches; dropping them up front keeps cached and stored results small.
+    """
+    hits = []
+    for item in raw.get("organic", ()):
+        hit: SerperHit = {
+            "title": item.get("title", ""),
+            "link": item.get("link", ""),
+            "snippet": item.get("snippet", "")
+        }
+        if "date" in item:
+            hit["date"] = item["date"]
+        hits.append(hit)
+    return hits
+
+
+def _company_queries(company_name: str, domain: Optional[str] = None) -> List[str]:
+    """Queries behind search_company, in _COMPANY_QUERY_KEYS order."""
+    queries = [
+        f"{company_name} company overview",
+        f"{company_name} recent news 2024",
+        f"{company_name} leadership team executives",
+        f"{company_name} funding revenue business model",
+    ]
+    if domain:
+        queries.append(f"site:{domain} about company")
+    return queries
+
+
+def _news_query(company_name: str, days: int = 30) -> str:
+    """Query behind search_company_news."""
+    return f"{company_name} news recent updates past {days} days"
+
+
+def _people_queries(company_name: str) -> List[str]:
+    """Queries behind search_company_people."""
+    return [
+        f"{company_name} CEO founder leadership team",
+        f"{company_name} executives management team",
+        f"{company_name} board of directors"
+    ]
+
+
+def _normalize(query: str) -> str:
+    """Fold casing and whitespace so equivalent queries share a cache entry."""
+    return " ".join(query.lower().split())
+
+
 class SerperSearchTool:
     """Web search tool using Serper API for Google search results."""
     
     def __init__(self):
         self.api_key = settings.serper_api_key
         self.base_url = "https://google.serper.dev/search"
+        self._client: Optional[httpx.AsyncClient] = None
+        self._local_cache = not settings.redis_url
+        # (normalized query, num) -> (expires at, results), least recently used first
+        self._search_cache: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
         
         if not self.api_key:
             logger.warning("Serper API key not found in environment variables")
     
-    async def search_company(self, company_name: str, domain: Optional[str] = None) -> Dict[str, Any]:
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get or create the pooled client, with the API key sent on every request."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                timeout=_HTTP_TIMEOUT,
+                limits=_HTTP_LIMITS,
+                headers={
+                    "X-API-KEY": self.api_key or "",
+                    "Content-Type": "application/json"
+                }
+            )
+        return self._client
+    
+    async def search_company(self, company_name: str, domain: Optional[str] = None,
+                             use_cache: bool = True) -> Dict[str, Any]:
         """Search for comprehensive company information."""
-        search_queries = [
-            f"{company_name} company overview",
-            f"{company_name} recent news 2024",
-            f"{company_name} leadership team executives",
-            f"{company_name} funding revenue business model",
-        ]
-        
-        if domain:
-            search_queries.append(f"site:{domain} about company")
+        search_queries = _company_queries(company_name, domain)
         
         all_results = {}
         
-        for query in search_queries:
-            try:
-                results = await self._perform_search(query)
-                query_key = query.split()[-1]  # Use last word as key
+        # Serper accepts several queries in one request, so send them together
+        responses = await self._perform_batch(search_queries, use_cache)
+        for query_key, query, results in zip(_COMPANY_QUERY_KEYS, search_queries, responses):
+            if isinstance(results, Exception):
+                logger.error("Search failed for '%s': %s", query, results)
+                all_results[query_key] = {"error": str(results)}
+            else:
                 all_results[query_key] = results
-                logger.info(f"Successfully searched: {query}")
-            except Exception as e:
-                logger.error(f"Search failed for '{query}': {e}")
-                all_results[query.split()[-1]] = {"error": str(e)}
+                logger.info("Successfully searched: %s", query)
         
         return all_results
     
-    async def search_company_news(self, company_name: str, days: int = 30) -> List[Dict[str, Any]]:
-        """Search for recent company news and updates."""
-        query = f"{company_name} news recent updates past {days} days"
+    async def search_company_news(self, company_name: str, days: int = 30,
+                                  use_cache: bool = True) -> List[SerperHit]:
+        """Search for recent company news and updates.
+
+        Raises if the search fails, so callers can tell a failure from no news.
+        """
+        query = _news_query(company_name, days)
         
-        try:
-            results = await self._perform_search(query)
-            return results.get("organic", [])[:10]  # Return top 10 news results
-        except Exception as e:
-            logger.error(f"News search failed for {company_name}: {e}")
-            return []
+        results = await self._perform_search(query, use_cache)
+        return results.get("organic", [])[:10]  # Return top 10 news results
     
-    async def search_company_people(self, company_name: str) -> List[Dict[str, Any]]:
-        """Search for company leadership and key personnel."""
-        queries = [
-            f"{company_name} CEO founder leadership team",
-            f"{company_name} executives management team",
-            f"{company_name} board of directors"
-        ]
+    async def search_company_people(self, company_name: str, use_cache: bool = True) -> List[SerperHit]:
+        """Search for company leadership and key personnel.
+
+        Raises if any of the queries fails, rather than returning partial results
+        that callers would mistake for a complete search.
+        """
+        queries = _people_queries(company_name)
         
-        people_results = []
+        responses = await self._perform_batch(queries, use_cache)
+        for query, results in zip(queries, responses):
+            if isinstance(results, Exception):
+                logger.error("People search failed for '%s': %s", query, results)
+                raise results
         
-        for query in queries:
-            try:
-                results = await self._perform_search(query)
-                organic_results = results.get("organic", [])
-                people_results.extend(organic_results[:3])  # Top 3 from each query
-            except Exception as e:
-                logger.error(f"People search failed for '{query}': {e}")
-        
-        return people_results[:10]  # Return top 10 overall
+        people_results: List[SerperHit] = []
+        for results in responses:
+            organic_results = results.get("organic", [])
+            # Top 3 from each query, up to 10 overall
+            take = min(_PEOPLE_PER_QUERY, _MAX_PEOPLE_RESULTS - len(people_results))
+            people_results.extend(organic_results[:take])
+            if len(people_results) >= _MAX_PEOPLE_RESULTS:
+                break
+        
+        return people_results
     
-    async def _perform_search(self, query: str) -> Dict[str, Any]:
-        """Perform the actual search request to Serper API."""
+    async def _perform_search(self, query: str, use_cache: bool = True) -> Dict[str, Any]:
+        """Perform the search request to Serper API, reusing recent identical queries.
+
+        use_cache=False always calls Serper, then stores the fresh result.
+        """
         if not self.api_key:
             raise ValueError("Serper API key not configured")
         
-        headers = {
-            "X-API-KEY": self.api_key,
-            "Content-Type": "application/json"
-        }
+        query = _normalize(query)
+        if use_cache:
+            cached = self._cache_get(query)
+            if cached is not None:
+                return cached
         
         payload = {
             "q": query,
-            "num": 10  # Number of results
+            "num": _RESULTS_PER_QUERY  # Number of results
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                headers=headers,
-                json=payload,
-                timeout=30.0
+        response = await self.client.post(self.base_url, json=payload)
+        logger.debug("Serper responded over %s", response.http_version)
+        
+        response.raise_for_status()
+        results = {"organic": _extract_organic(orjson.loads(response.content))}
+        
+        self._cache_put(query, results)
+        return results
+    
+    async def _perform_batch(self, queries: List[str], use_cache: bool = True) -> List[Any]:
+        """Run several searches in one Serper request, in the order given.
+
+        Like asyncio.gather(..., return_exceptions=True), a query that Serper
+        returns no results for is returned as an exception. HTTP errors, such as
+        rate limiting, are raised rather than retried query by query; only a
+        malformed batch response falls back to individual requests.
+        """
+        if not self.api_key:
+            raise ValueError("Serper API key not configured")
+        
+        normalized = [_normalize(query) for query in queries]
+        results: List[Any] = [self._cache_get(query) if use_cache else None for query in normalized]
+        missing = [i for i, result in enumerate(results) if result is None]
+        if not missing:
+            return results
+        
+        payload = [{"q": normalized[i], "num": _RESULTS_PER_QUERY} for i in missing]
+        response = await self.client.post(self.base_url, json=payload)
+        logger.debug("Serper responded over %s", response.http_version)
+        response.raise_for_status()
+        
+        try:
+            batch = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            batch = None
+        if not isinstance(batch, list) or len(batch) != len(missing):
+            logger.warning("Malformed Serper batch response, retrying %s queries individually", len(missing))
+            retried = await asyncio.gather(
+                *(self._perform_search(normalized[i], use_cache=False) for i in missing),
+                return_exceptions=True
             )
-            
-            response.raise_for_status()
-            return response.json()
+            for i, result in zip(missing, retried):
+                results[i] = result
+            return results
+        
+        for i, item in zip(missing, batch):
+            if isinstance(item, dict) and "organic" in item:
+                results[i] = {"organic": _extract_organic(item)}
+                self._cache_put(normalized[i], results[i])
+            else:
+                message = item.get("message") if isinstance(item, dict) else None
+                results[i] = ValueError(f"No Serper results: {message or 'unexpected response'}")
+        return results
+    
+    def _cache_get(self, query: str) -> Optional[Dict[str, Any]]:
+        """Return the unexpired cached results for a normalized query, if any."""
+        if not self._local_cache:
+            return None
+        cache_key = (query, _RESULTS_PER_QUERY)
+        entry = self._search_cache.get(cache_key)
+        if entry is None or entry[0] <= time.monotonic():
+            return None
+        self._search_cache.move_to_end(cache_key)
+        return entry[1]
+    
+    def _cache_put(self, query: str, results: Dict[str, Any]) -> None:
+        """Cache results for a normalized query, evicting the least recently used."""
+        if not self._local_cache:
+            return
+        cache_key = (query, _RESULTS_PER_QUERY)
+        self._search_cache[cache_key] = (time.monotonic() + _SEARCH_CACHE_TTL_SECONDS, results)
+        self._search_cache.move_to_end(cache_key)
+        if len(self._search_cache) > _SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+    
+    def forget_company(self, company_name: str, domain: Optional[str] = None) -> None:
+        """Drop this process's cached searches for a company.
+
+        The site: query is only dropped when a domain is given, since it does
+        not depend on the company name.
+        """
+        queries = [*_company_queries(company_name, domain), _news_query(company_name), *_people_queries(company_name)]
+        for query in queries:
+            self._search_cache.pop((_normalize(query), _RESULTS_PER_QUERY), None)
+    
+    async def aclose(self) -> None:
+        """Close the pooled HTTP client, if one was created."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
     def is_configured(self) -> bool:
         """Check if the tool is properly configured."""
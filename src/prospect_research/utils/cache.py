@@ -0,0 +1,197 @@
+"""
+Redis-backed cache helpers shared by the API and agents.
+
+Caching is optional: without REDIS_URL every helper behaves as a cache miss,
+and Redis errors are logged and treated the same way so requests never fail
+because the cache is unavailable.
+"""
+
+import asyncio
+import hashlib
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, TypeVar
+
+import orjson
+
+from ..config.settings import settings
+from .logger import setup_logger
+
+logger = setup_logger("cache")
+
+T = TypeVar("T")
+
+# Raw Serper payloads are kept for a day, for callers that ask for them
+RAW_SEARCH_TTL_SECONDS = 24 * 60 * 60
+
+_redis: Optional[Any] = None
+
+
+def get_redis() -> Optional[Any]:
+    """Return the shared redis.asyncio client, or None when caching is disabled."""
+    global _redis
+    if _redis is None and settings.redis_url:
+        # Imported lazily so processes without Redis configured never load it
+        import redis.asyncio as redis
+        _redis = redis.from_url(settings.redis_url)
+    return _redis
+
+
+def research_cache_key(company_name: str, domain: Optional[str]) -> str:
+    """Normalized cache key for a company research result."""
+    return f"research:v1:{company_name.strip().lower()}:{(domain or '').strip().lower()}"
+
+
+def research_domains_key(company_name: str) -> str:
+    """Key of the set of domains a company has been researched under."""
+    return f"research:domains:v1:{company_name.strip().lower()}"
+
+
+def raw_search_key(research_id: str) -> str:
+    """Cache key for the raw search data behind a research result."""
+    return f"research:raw:{research_id}"
+
+
+async def get_json(key: str) -> Optional[Any]:
+    """Return the decoded value stored at key, or None on a miss."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        cached = await client.get(key)
+    except Exception as e:
+        logger.warning("Cache get failed for %s: %s", key, e)
+        return None
+    return orjson.loads(cached) if cached is not None else None
+
+
+async def set_json(key: str, value: Any, ttl_seconds: int) -> None:
+    """Store value at key as JSON with an expiry."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        await client.set(key, orjson.dumps(value, default=str), ex=ttl_seconds)
+    except Exception as e:
+        logger.warning("Cache set failed for %s: %s", key, e)
+
+
+def cached_call_key(namespace: str, key_parts: Iterable[str]) -> str:
+    """Cache key used by cached_call, normalized and hashed so equivalent lookups match."""
+    digest = hashlib.sha1("|".join(part.strip().lower() for part in key_parts).encode()).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+async def cached_call(namespace: str, key_parts: Iterable[str],
+                      coro_factory: Callable[[], Awaitable[T]], ttl_seconds: int,
+                      refresh: bool = False,
+                      should_cache: Callable[[T], bool] = bool) -> T:
+    """Return the cached result for key_parts, awaiting coro_factory() on a miss.
+
+    The entry is stored under cached_call_key(namespace, key_parts). Only
+    results accepted by should_cache are stored (by default, non-empty ones),
+    so a failed upstream call is retried next time.
+    With refresh, the cached value is ignored and replaced by a fresh result.
+    """
+    key = cached_call_key(namespace, key_parts)
+    cached = None if refresh else await get_json(key)
+    if cached is not None:
+        return cached
+    result = await coro_factory()
+    if should_cache(result):
+        await set_json(key, result, ttl_seconds)
+    return result
+
+
+async def wait_for_json(key: str, timeout_seconds: float, interval_seconds: float = 0.25,
+                        lock_key: Optional[str] = None) -> Optional[Any]:
+    """Poll key until it holds a value or the timeout expires.
+
+    With lock_key, also stop once that lock is released without a value
+    being written, since none is coming.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout_seconds
+    while loop.time() < deadline:
+        value = await get_json(key)
+        if value is not None:
+            return value
+        if lock_key is not None and not await exists(lock_key):
+            # The holder may have written the value just before releasing
+            return await get_json(key)
+        await asyncio.sleep(interval_seconds)
+    return None
+
+
+async def exists(key: str) -> bool:
+    """Whether key is present. False without Redis or when Redis errors."""
+    client = get_redis()
+    if client is None:
+        return False
+    try:
+        return bool(await client.exists(key))
+    except Exception as e:
+        logger.warning("Cache exists failed for %s: %s", key, e)
+        return False
+
+
+async def acquire_lock(key: str, ttl_seconds: int) -> bool:
+    """Try to take a short-lived lock with SET NX. Always succeeds without Redis."""
+    client = get_redis()
+    if client is None:
+        return True
+    try:
+        return bool(await client.set(key, "1", nx=True, ex=ttl_seconds))
+    except Exception as e:
+        logger.warning("Cache lock failed for %s: %s", key, e)
+        return True
+
+
+async def release_lock(key: str) -> None:
+    """Release a lock taken with acquire_lock."""
+    await delete(key)
+
+
+async def delete(*keys: str) -> int:
+    """Delete keys, returning how many existed."""
+    client = get_redis()
+    if client is None or not keys:
+        return 0
+    try:
+        return int(await client.delete(*keys))
+    except Exception as e:
+        logger.warning("Cache delete failed for %s: %s", keys, e)
+        return 0
+
+
+async def add_member(key: str, member: str, ttl_seconds: int) -> None:
+    """Add member to the set at key, renewing the set's expiry."""
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        async with client.pipeline(transaction=False) as pipe:
+            pipe.sadd(key, member)
+            pipe.expire(key, ttl_seconds)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning("Cache set add failed for %s: %s", key, e)
+
+
+async def members(key: str) -> List[str]:
+    """Return the members of the set at key."""
+    client = get_redis()
+    if client is None:
+        return []
+    try:
+        return [member.decode() if isinstance(member, bytes) else member
+                for member in await client.smembers(key)]
+    except Exception as e:
+        logger.warning("Cache set read failed for %s: %s", key, e)
+        return []
+
+
+async def close() -> None:
+    """Close the shared Redis connection pool."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -1,41 +1,59 @@
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 from ..config.settings import settings
 from .logger import setup_logger
 from typing import Optional
 import asyncio
+import threading
+import httpx
 
 logger = setup_logger("database")
 
+# Connection pool shared by every agent's PostgREST calls. Only the database
+# API is used by this platform; supabase-py re-bases this client for whichever
+# service it is handed to, so storage/functions would need their own.
+_HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+_HTTP_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+
 class SupabaseClient:
     """Singleton Supabase client with connection management."""
     
     _instance: Optional['SupabaseClient'] = None
     _client: Optional[Client] = None
+    # Database calls run in worker threads, so creation is guarded to build
+    # exactly one instance and one client; the unlocked check keeps the hot path free
+    _lock = threading.Lock()
     
     def __new__(cls) -> 'SupabaseClient':
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
     
     @property
     def client(self) -> Client:
-        """Get or create Supabase client."""
+        """Get or create the process-wide Supabase client."""
         if self._client is None:
-            self._client = create_client(
-                settings.supabase_url,
-                settings.supabase_anon_key
-            )
-            logger.info("Supabase client initialized")
+            with self._lock:
+                if self._client is None:
+                    http_client = httpx.Client(http2=True, timeout=_HTTP_TIMEOUT, limits=_HTTP_LIMITS)
+                    self._client = create_client(
+                        settings.supabase_url,
+                        settings.supabase_anon_key,
+                        options=ClientOptions(httpx_client=http_client)
+                    )
+                    logger.info("Supabase client initialized")
         return self._client
     
     async def health_check(self) -> bool:
         """Check if Supabase connection is healthy."""
         try:
-            # Simple query to test connection
-            result = self.client.table('_health_check').select('*').limit(1).execute()
+            # Simple query to test connection; the client is sync, so run it
+            # in a thread rather than blocking the event loop for the round trip
+            await asyncio.to_thread(lambda: self.client.table('_health_check').select('*').limit(1).execute())
             return True
         except Exception as e:
-            logger.error(f"Supabase health check failed: {e}")
+            logger.error("Supabase health check failed: %s", e)
             return False
 
 # Global database instance
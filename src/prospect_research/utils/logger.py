@@ -1,19 +1,54 @@
+import atexit
+import functools
 import logging
-import json
-from pythonjsonlogger import jsonlogger
+import logging.handlers
+import queue
+import orjson
 from ..config.settings import settings
 
+
+class FastJsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line, encoded with orjson.
+
+    Records arrive through QueueHandler, which has already merged any
+    traceback into the message, so there is no separate exception field.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        return orjson.dumps({
+            "asctime": self.formatTime(record),
+            "name": record.name,
+            "levelname": record.levelname,
+            "message": record.getMessage()
+        }, default=str).decode()
+
+
+@functools.cache
+def _log_queue() -> "queue.SimpleQueue[logging.LogRecord]":
+    """Return the shared log queue, starting its listener thread on first use.
+
+    Log calls only enqueue the record; the listener formats and writes it,
+    so request handlers never block on the stream write.
+    """
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(FastJsonFormatter())
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(listener.stop)
+    return log_queue
+
+
+@functools.lru_cache(maxsize=None)
 def setup_logger(name: str) -> logging.Logger:
-    """Set up structured JSON logging."""
+    """Set up structured JSON logging. Each name is configured once."""
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, settings.log_level.upper()))
-    
+    # Records are written by this logger's handler; don't repeat them via the root logger
+    logger.propagate = False
+
     if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = jsonlogger.JsonFormatter(
-            '%(asctime)s %(name)s %(levelname)s %(message)s'
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-    
-    return logger
\ No newline at end of file
+        logger.addHandler(logging.handlers.QueueHandler(_log_queue()))
+
+    return logger
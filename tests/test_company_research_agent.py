@@ -0,0 +1,93 @@
+"""Tests for CompanyResearchAgent result caching."""
+
+import pytest
+
+from prospect_research.agents.research.company_research_agent import CompanyResearchAgent
+from prospect_research.utils import cache
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Replace the Redis helpers with an in-memory store and return it."""
+    store = {}
+
+    async def get_json(key):
+        return store.get(key)
+
+    async def set_json(key, value, ttl_seconds):
+        store[key] = value
+
+    async def acquire_lock(key, ttl_seconds):
+        return True
+
+    async def release_lock(key):
+        store.pop(key, None)
+
+    monkeypatch.setattr(cache, "get_json", get_json)
+    monkeypatch.setattr(cache, "set_json", set_json)
+    monkeypatch.setattr(cache, "acquire_lock", acquire_lock)
+    monkeypatch.setattr(cache, "release_lock", release_lock)
+    return store
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    """Agent with a configured search tool and no research tracking writes."""
+    agent = CompanyResearchAgent()
+    agent.search_tool.api_key = "test-key"
+
+    async def start_research(company_name, research_type, input_data, research_id=None):
+        return research_id
+
+    async def complete_research(*args, **kwargs):
+        return None
+
+    async def perform_batch(queries, use_cache=True):
+        return [{"organic": [{"title": query, "link": "", "snippet": ""}]} for query in queries]
+
+    async def perform_search(query, use_cache=True):
+        return {"organic": [{"title": query, "link": "", "snippet": ""}]}
+
+    monkeypatch.setattr(agent, "start_research", start_research)
+    monkeypatch.setattr(agent, "complete_research", complete_research)
+    monkeypatch.setattr(agent, "fail_research", complete_research)
+    monkeypatch.setattr(agent.search_tool, "_perform_batch", perform_batch)
+    monkeypatch.setattr(agent.search_tool, "_perform_search", perform_search)
+    return agent
+
+
+async def test_successful_research_is_cached(agent, stored):
+    result = await agent.execute({"company_name": "Acme", "domain": "acme.com"})
+    await agent.drain_background()
+
+    assert stored[cache.research_cache_key("Acme", "acme.com")] == result
+
+
+async def test_failed_news_search_is_not_cached(agent, stored, monkeypatch):
+    async def rate_limited(query, use_cache=True):
+        raise RuntimeError("429 Too Many Requests")
+
+    monkeypatch.setattr(agent.search_tool, "_perform_search", rate_limited)
+
+    result = await agent.execute({"company_name": "Acme", "domain": "acme.com"})
+    await agent.drain_background()
+
+    assert result["status"] == "completed"
+    assert cache.research_cache_key("Acme", "acme.com") not in stored
+
+
+async def test_failed_people_query_is_not_cached(agent, stored, monkeypatch):
+    async def partly_failing(queries, use_cache=True):
+        # Only the first leadership query fails; company searches succeed
+        return [
+            RuntimeError("429 Too Many Requests") if "ceo founder" in query.lower()
+            else {"organic": [{"title": query, "link": "", "snippet": ""}]}
+            for query in queries
+        ]
+
+    monkeypatch.setattr(agent.search_tool, "_perform_batch", partly_failing)
+
+    await agent.execute({"company_name": "Acme", "domain": "acme.com"})
+    await agent.drain_background()
+
+    assert cache.research_cache_key("Acme", "acme.com") not in stored